@@ -1,9 +1,7 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import random
 import os
 
@@ -11,7 +9,7 @@ import os
 st.set_page_config(page_title="Food Product Analysis", layout="wide", initial_sidebar_state="expanded")
 
 # Custom CSS
-st.markdown("""
+CUSTOM_CSS = """
     <style>
      /* Set the background color for the entire app */
      .stApp {
@@ -326,23 +324,46 @@ st.markdown("""
         }
      }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+# Re-emitted on every rerun: Streamlit drops any element a rerun does not render again
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 # Load data
+COUNT_COLUMNS = ('harmful_ingredient_count', 'total_ingredients')
+
 @st.cache_data
-def load_data():
+def load_data(path):
     try:
-        data = pd.read_csv('yes no data.csv')
+        data = pd.read_csv(path)
         data.columns = [col.strip().lower().replace(' ', '_') for col in data.columns]
-        data.fillna("N/A", inplace=True)
+        # Every text column shows up in the product details; the counts are filled with 0 below
+        str_cols = data.select_dtypes(include="object").columns.difference(COUNT_COLUMNS)
+        data[str_cols] = data[str_cols].fillna("N/A")
+        for col in COUNT_COLUMNS:
+            if col in data.columns:
+                data[col] = pd.to_numeric(data[col], errors='coerce').fillna(0).astype(np.int16)
+        data['is_harmful?'] = data['is_harmful?'].astype(str).str.lower()
+        for col in ('brand', 'category', 'is_harmful?'):
+            data[col] = data[col].astype('category')
         return data
     except FileNotFoundError:
         st.error("Dataset file not found!")
         return None
 
-data = load_data()
+@st.cache_data
+def get_filter_options(path):
+    data = load_data(path)
+    categories = tuple(data["category"].cat.categories)
+    brands = tuple(data["brand"].cat.categories)
+    return categories, brands
+
+DATA_PATH = 'yes no data.csv'
+MAX_DISPLAY_ROWS = 200
+data = load_data(DATA_PATH)
 if data is None:
     st.stop()
+category_options, brand_options = get_filter_options(DATA_PATH)
 
 # Title section with enhanced layout
 col1, col2 = st.columns([1, 5])
@@ -362,19 +383,21 @@ with col2:
 # Sidebar filters
 with st.sidebar:
     st.markdown('<p class="sidebar-text">🔍 Search & Filter</p>', unsafe_allow_html=True)
-    search_query = st.text_input("Search Products", value="", placeholder="Type product name...")
+    with st.form("search"):
+        search_query = st.text_input("Search Products", value="", placeholder="Type product name...")
+        st.form_submit_button("Search")
     st.markdown('<hr style="margin: 20px 0;">', unsafe_allow_html=True)
     
     st.markdown('<p class="sidebar-text">📁 Category</p>', unsafe_allow_html=True)
     category_filter = st.selectbox(
         "",
-        options=["All"] + sorted(data["category"].dropna().unique().tolist())
+        options=("All",) + category_options
     )
     
     st.markdown('<p class="sidebar-text">🏢 Brand</p>', unsafe_allow_html=True)
     brand_filter = st.multiselect(
         "",
-        options=sorted(data["brand"].dropna().unique().tolist())
+        options=brand_options
     )
     
     st.markdown('<p class="sidebar-text">⚠ Product Safety</p>', unsafe_allow_html=True)
@@ -417,13 +440,14 @@ def display_random_images(num_images=3):
 display_random_images()
 
 # Filter data
-filtered_data = data.copy()
+mask = np.ones(len(data), dtype=bool)
 if category_filter != "All":
-    filtered_data = filtered_data[filtered_data["category"] == category_filter]
+    mask &= (data["category"].values == category_filter)
 if brand_filter:
-    filtered_data = filtered_data[filtered_data["brand"].isin(brand_filter)]
+    mask &= data["brand"].isin(brand_filter).values
 if harmful_filter != "All":
-    filtered_data = filtered_data[filtered_data["is_harmful?"].str.lower() == harmful_filter.lower()]
+    mask &= (data["is_harmful?"].values == harmful_filter.lower())
+filtered_data = data if mask.all() else data[mask]
 
 # Metrics
 col1, col2, col3 = st.columns(3)
@@ -440,21 +464,58 @@ with col3:
 # Product list
 st.markdown("<h3 style='color: black;'>📊 Product List</h3>", unsafe_allow_html=True)
 st.dataframe(
-    filtered_data[['product_name', 'brand', 'category', 'is_harmful?']],
+    filtered_data[['product_name', 'brand', 'category', 'is_harmful?']].head(MAX_DISPLAY_ROWS),
     use_container_width=True
 )
+if len(filtered_data) > MAX_DISPLAY_ROWS:
+    st.caption(f"Showing the first {MAX_DISPLAY_ROWS} of {len(filtered_data)} products. Use the filters to narrow the list.")
 
 # Search functionality
-vectorizer = TfidfVectorizer()
-vectorizer.fit(data['product_name'].dropna())
+@st.cache_resource
+def get_vectorizer_and_matrix(texts):
+    # Character n-grams match short, variably worded product names better than whole words
+    vectorizer = TfidfVectorizer(
+        analyzer='char_wb',
+        ngram_range=(3, 5),
+        sublinear_tf=True,
+        min_df=1,
+        max_features=50000,
+        dtype=np.float32
+    ).fit(texts)
+    return vectorizer, vectorizer.transform(texts)
+
+vectorizer, corpus_matrix = get_vectorizer_and_matrix(data['product_name'])
+# Maps a row label of `data` to its row in corpus_matrix
+name_to_row = pd.Series(np.arange(len(data)), index=data.index)
 
 def search_product(query, data):
+    if data.empty:
+        return None, 0.0
     query_vector = vectorizer.transform([query])
-    data_vectors = vectorizer.transform(data['product_name'].dropna())
-    similarities = cosine_similarity(query_vector, data_vectors).flatten()
+    rows = name_to_row.loc[data.index].values
+    data_vectors = corpus_matrix[rows]
+    # TF-IDF rows are already L2-normalized, so the dot product is the cosine similarity
+    similarities = (query_vector @ data_vectors.T).toarray().ravel()
     best_match_idx = np.argmax(similarities)
     return data.iloc[best_match_idx], similarities[best_match_idx]
 
+@st.cache_data
+def make_composition_pie(harmful, non_harmful):
+    # Imported lazily so sessions that never search skip Matplotlib's startup cost
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots()
+    ax.pie(
+        [harmful, non_harmful],
+        labels=['Harmful', 'Non-Harmful'],
+        autopct='%1.1f%%',
+        colors=['#E74C3C', '#2ECC71'],
+        startangle=90
+    )
+    ax.set_title("Ingredient Composition")
+    plt.close(fig)
+    return fig
+
 # Search results
 if search_query:
     try:
@@ -464,23 +525,12 @@ if search_query:
             st.write(result)
 
             # Ingredient composition chart
-            harmful = pd.to_numeric(result.get('harmful_ingredient_count', 0), errors='coerce')
-            total = pd.to_numeric(result.get('total_ingredients', 0), errors='coerce')
+            harmful = int(result.get('harmful_ingredient_count', 0))
+            total = int(result.get('total_ingredients', 0))
             
-            if pd.notnull(total) and pd.notnull(harmful) and total > 0:
-                harmful = int(harmful)
-                total = int(total)
+            if total > 0:
                 non_harmful = total - harmful
-                fig, ax = plt.subplots()
-                ax.pie(
-                    [harmful, non_harmful],
-                    labels=['Harmful', 'Non-Harmful'],
-                    autopct='%1.1f%%',
-                    colors=['#E74C3C', '#2ECC71'],
-                    startangle=90
-                )
-                ax.set_title("Ingredient Composition")
-                st.pyplot(fig)
+                st.pyplot(make_composition_pie(harmful, non_harmful))
             else:
                 st.warning("Ingredient composition data is not available for this product.")
 